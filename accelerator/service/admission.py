@@ -0,0 +1,174 @@
+# Kept in sync by hand with rag-app/app/admission.py: the two services are
+# deployed separately and have no shared package to import it from.
+"""Admission control for /ask.
+
+A bounded priority queue in front of an AIMD concurrency limit. The limit
+grows by ~1 per window of fast completions and is cut multiplicatively when
+latency goes over target, so the service settles near the concurrency the
+LLM backend can actually sustain. Callers that cannot be served in time are
+rejected up front (429/503 + Retry-After) instead of piling up.
+"""
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+
+INTERACTIVE = 0
+BATCH = 1
+PRIORITIES = {"interactive": INTERACTIVE, "batch": BATCH}
+
+
+class Rejected(Exception):
+    def __init__(self, status_code: int, reason: str, retry_after: int | None = None):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        min_limit: int = 1,
+        max_limit: int = 16,
+        initial_limit: int = 4,
+        max_queue: int = 32,
+        batch_queue_share: float = 0.5,
+        target_latency: float = 8.0,
+        backoff: float = 0.9,
+        client_errors: tuple[type[BaseException], ...] = (),
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.batch_queue = int(max_queue * batch_queue_share)
+        self.target_latency = target_latency
+        self.backoff = backoff
+        self.client_errors = client_errors  # caller mistakes, never counted as backend failures
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._inflight = 0
+        self._waiters = []  # heap of (priority, seq, future)
+        self._queued = [0, 0]  # live waiters per priority
+        self._seq = itertools.count()
+        self._avg_latency = None  # seeded by the first completed request
+        self._last_decrease = 0.0
+        self._counters = {"admitted": 0, "rejected": 0, "expired": 0, "evicted": 0}
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def retry_after(self) -> int:
+        # Little's law: the queue drains at roughly limit / avg_latency per second.
+        queued = sum(self._queued) + 1
+        avg = self._avg_latency if self._avg_latency is not None else 1.0
+        return max(1, math.ceil(queued * avg / max(self.limit, 1)))
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "inflight": self._inflight,
+            "queued": {"interactive": self._queued[INTERACTIVE], "batch": self._queued[BATCH]},
+            "avg_latency_s": None if self._avg_latency is None else round(self._avg_latency, 3),
+            **self._counters,
+        }
+
+    def _reject(self, status_code: int, reason: str):
+        self._counters["rejected"] += 1
+        return Rejected(status_code, reason, self.retry_after())
+
+    def _evict_batch(self) -> bool:
+        # Make room for an interactive caller by failing the newest queued batch caller.
+        newest = None
+        for i, (prio, seq, fut) in enumerate(self._waiters):
+            if prio == BATCH and not fut.done() and (newest is None or seq > self._waiters[newest][1]):
+                newest = i
+        if newest is None:
+            return False
+        fut = self._waiters[newest][2]
+        fut.set_exception(self._reject(429, "evicted by interactive traffic"))
+        self._queued[BATCH] -= 1
+        self._counters["evicted"] += 1
+        return True
+
+    async def acquire(self, priority: int, deadline: float):
+        if self._inflight < self.limit and not sum(self._queued):
+            self._inflight += 1
+            return
+        if priority == BATCH and self._queued[BATCH] >= self.batch_queue:
+            raise self._reject(429, "batch queue full")
+        if sum(self._queued) >= self.max_queue:
+            if priority != INTERACTIVE or not self._evict_batch():
+                raise self._reject(429 if priority == BATCH else 503, "queue full")
+
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), fut))
+        self._queued[priority] += 1
+        try:
+            await asyncio.wait({fut}, timeout=max(deadline - time.monotonic(), 0))
+        except asyncio.CancelledError:
+            self._abandon(priority, fut)
+            raise
+        if not fut.done():
+            self._abandon(priority, fut)
+            self._counters["expired"] += 1
+            raise self._reject(503, "deadline exceeded while queued")
+        fut.result()  # re-raises eviction
+
+    def _abandon(self, priority: int, fut: asyncio.Future):
+        if not fut.done():
+            fut.cancel()
+            self._queued[priority] -= 1
+        elif not fut.cancelled() and fut.exception() is None:
+            # Slot was handed over just as we gave up; pass it on.
+            self._release_slot()
+
+    def _release_slot(self):
+        self._inflight -= 1
+        while self._waiters and self._inflight < self.limit:
+            prio, _, fut = heapq.heappop(self._waiters)
+            if fut.done():
+                continue
+            self._queued[prio] -= 1
+            self._inflight += 1
+            fut.set_result(None)
+
+    def release(self, latency: float, ok: bool = True):
+        now = time.monotonic()
+        if self._avg_latency is None:
+            self._avg_latency = latency
+        else:
+            self._avg_latency = 0.8 * self._avg_latency + 0.2 * latency
+        if ok and latency <= self.target_latency:
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+        elif now - self._last_decrease >= self.target_latency:
+            # At most one cut per target window, so a burst of slow calls counts once.
+            self._limit = max(self.min_limit, self._limit * self.backoff)
+            self._last_decrease = now
+        self._release_slot()
+
+    @asynccontextmanager
+    async def admit(self, priority: str, timeout: float):
+        prio = PRIORITIES.get((priority or "interactive").lower(), INTERACTIVE)
+        deadline = time.monotonic() + timeout
+        await self.acquire(prio, deadline)
+        if time.monotonic() >= deadline:
+            self._release_slot()
+            self._counters["expired"] += 1
+            raise self._reject(503, "deadline exceeded while queued")
+        self._counters["admitted"] += 1
+        start = time.monotonic()
+        try:
+            yield deadline
+        except (Rejected, asyncio.CancelledError, *self.client_errors):
+            # Shed or refused (client gone, bad request): the backend wasn't the
+            # problem, so the slot is returned without touching latency or the limit.
+            self._release_slot()
+            raise
+        except BaseException:
+            self.release(time.monotonic() - start, ok=False)
+            raise
+        else:
+            self.release(time.monotonic() - start, ok=True)
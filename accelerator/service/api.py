@@ -1,7 +1,30 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from rag.pipeline import answer_question
+from service.admission import AdmissionController, Rejected
+from service.deps import settings
 app = FastAPI()
+admission = AdmissionController(
+    min_limit=settings.ADMISSION_MIN_LIMIT,
+    max_limit=settings.ADMISSION_MAX_LIMIT,
+    initial_limit=settings.ADMISSION_INITIAL_LIMIT,
+    max_queue=settings.ADMISSION_MAX_QUEUE,
+    batch_queue_share=settings.ADMISSION_BATCH_QUEUE_SHARE,
+    target_latency=settings.ADMISSION_TARGET_LATENCY_S,
+)
 class AskReq(BaseModel): question: str
+@app.exception_handler(Rejected)
+def rejected(request: Request, exc: Rejected):
+    headers = {'Retry-After': str(exc.retry_after)} if exc.retry_after else None
+    return JSONResponse(status_code=exc.status_code, content={'detail': exc.reason}, headers=headers)
 @app.post('/ask')
-def ask(req: AskReq): return {'answer': answer_question(req.question)['answer'], 'citations': []}
+async def ask(req: AskReq, request: Request, x_priority: str = Header('interactive'), x_request_timeout: float | None = Header(None)):
+    timeout = min(settings.ADMISSION_QUEUE_TIMEOUT_S, x_request_timeout or settings.ADMISSION_QUEUE_TIMEOUT_S)
+    async with admission.admit(x_priority, timeout):
+        if await request.is_disconnected(): raise Rejected(499, 'client disconnected')
+        result = await run_in_threadpool(answer_question, req.question)
+    return {'answer': result['answer'], 'citations': []}
+@app.get('/admission')
+def admission_stats(): return admission.stats()
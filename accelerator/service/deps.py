@@ -1,2 +1,17 @@
-class Settings: pass
+from pydantic_settings import BaseSettings
+
+class Settings(BaseSettings):
+    ADMISSION_MIN_LIMIT: int = 1
+    ADMISSION_MAX_LIMIT: int = 16
+    ADMISSION_INITIAL_LIMIT: int = 4
+    ADMISSION_MAX_QUEUE: int = 32
+    ADMISSION_BATCH_QUEUE_SHARE: float = 0.5
+    ADMISSION_TARGET_LATENCY_S: float = 8.0
+    ADMISSION_QUEUE_TIMEOUT_S: float = 30.0
+
+    class Config:
+        env_file = ".env"
+        env_file_encoding = "utf-8"
+        extra = "ignore"
+
 settings=Settings()
@@ -0,0 +1,148 @@
+"""Preload-and-fork serving.
+
+    python -m api.prefork --workers 4 --port 8001
+
+The parent imports api.server once -- embedding model, tokenizer, LLM client
+and the warm collections in the registry -- freezes the GC so collections
+don't dirty those pages, binds the socket, and forks the workers. Workers
+share the preloaded pages copy-on-write and only rebuild per-process state
+(HTTP clients, locks, admission control, thread pools) via
+server.after_fork(). The parent loads weights but never runs a model
+(collection warm-up searches with stored vectors, see chain.warm_up): torch's
+OpenMP pool is not fork-safe once started, so it must first start in the
+workers. ONNX Runtime sessions are not shared at all: ORT keeps the weights in
+its own heap, so with EMBEDDINGS_BACKEND=onnx each worker opens a session on
+first use (server.before_fork() closes any the parent has) -- the embedding
+weights are paid once per worker. Dead workers are re-forked from the warm
+parent, so a restart costs a fork instead of a model load.
+
+Per-worker RSS/PSS is printed as JSON when all workers are up, every
+--report-interval seconds and on SIGUSR1; each worker also serves its own
+numbers at GET /memory.
+"""
+import argparse, gc, json, os, select, signal, socket, sys, time
+
+from app.memory import memory
+
+
+def _cpus():
+    return len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+
+
+def _bind(host, port):
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _worker(server, sock, ready_w, args, threads):
+    import uvicorn
+
+    server.after_fork(threads)
+    server.app.router.on_startup.append(lambda: os.write(ready_w, f"{os.getpid()}\n".encode()))
+    config = uvicorn.Config(server.app, log_level=args.log_level, timeout_keep_alive=5)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def report(workers, event):
+    mem = {"parent": {"pid": os.getpid(), **memory()}}
+    mem["workers"] = [{"pid": pid, **memory(pid)} for pid in sorted(workers)]
+    procs = [mem["parent"], *mem["workers"]]
+    total = {k: round(sum(p.get(k, 0) for p in procs), 1) for k in ("rss_mb", "pss_mb")}
+    print(json.dumps({"event": event, "workers": len(workers), "total": total, **mem}), flush=True)
+
+
+def main():
+    p = argparse.ArgumentParser(description="Serve rag-app from N workers forked off one preloaded parent")
+    p.add_argument("--workers", type=int, default=2)
+    p.add_argument("--host", default="0.0.0.0")
+    p.add_argument("--port", type=int, default=8001)
+    p.add_argument("--threads", type=int, default=0, help="Compute threads per worker (default: CPUs / workers)")
+    p.add_argument("--report-interval", type=float, default=0, help="Seconds between memory reports (0: off)")
+    p.add_argument("--log-level", default="warning")
+    args = p.parse_args()
+
+    started = time.monotonic()
+    from api import server  # the one expensive load
+
+    preload_s = time.monotonic() - started
+    server.before_fork()
+    gc.collect()
+    gc.freeze()
+
+    sock = _bind(args.host, args.port)
+    threads = args.threads or max(1, _cpus() // args.workers)
+    ready_r, ready_w = os.pipe()
+    workers, ready = {}, set()
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_r)
+            for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGUSR1):
+                signal.signal(sig, signal.SIG_DFL)
+            code = 0
+            try:
+                _worker(server, sock, ready_w, args, threads)
+            except BaseException:
+                import traceback
+                traceback.print_exc()
+                code = 1
+            os._exit(code)
+        workers[pid] = time.monotonic()
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            os.kill(pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGUSR1, lambda s, f: report(workers, "memory"))
+
+    for _ in range(args.workers):
+        spawn()
+
+    announced, last_report = False, time.monotonic()
+    buf = b""
+    while workers:
+        try:
+            readable, _, _ = select.select([ready_r], [], [], 1.0)
+        except InterruptedError:
+            readable = []
+        if readable:
+            buf += os.read(ready_r, 4096)
+            *lines, buf = buf.split(b"\n")
+            ready.update(int(line) for line in lines if line)
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                pid = 0
+            if not pid:
+                break
+            born = workers.pop(pid, None)
+            ready.discard(pid)
+            if not stopping:
+                print(f"worker {pid} exited ({status}); re-forking", file=sys.stderr, flush=True)
+                if born and time.monotonic() - born < 1:
+                    time.sleep(1)  # don't spin on a worker that dies at startup
+                spawn()
+        if not announced and len(ready & workers.keys()) == args.workers:
+            announced = True
+            print(json.dumps({"event": "ready", "preload_s": round(preload_s, 3),
+                              "startup_s": round(time.monotonic() - started, 3)}), flush=True)
+            report(workers, "memory")
+        if args.report_interval and time.monotonic() - last_report >= args.report_interval:
+            last_report = time.monotonic()
+            report(workers, "memory")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,74 @@
-from fastapi import FastAPI
+import os
+import time
+from fastapi import FastAPI, Header, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from app.chain import build_chain
+from app.admission import AdmissionController, Rejected
+from app import chain, embeddings
+from app.chain import default_collection
+from app.errors import UnknownCollection
+from app.memory import memory
+from app.rerank import stats as rerank_stats
+from app.registry import RetrieverRegistry
+from app.settings import settings
 
 app = FastAPI(title="Grounded QA")
-qa = build_chain()
+registry = RetrieverRegistry(
+    default=default_collection(),
+    max_warm=settings.REGISTRY_MAX_WARM,
+    memory_budget_mb=settings.REGISTRY_MEMORY_BUDGET_MB,
+    allowed=[n.strip() for n in settings.REGISTRY_COLLECTIONS.split(",") if n.strip()],
+)
+registry.warm([registry.default] + [n.strip() for n in settings.REGISTRY_WARM.split(",") if n.strip()])
+
+def _build_admission():
+    return AdmissionController(
+        min_limit=settings.ADMISSION_MIN_LIMIT,
+        max_limit=settings.ADMISSION_MAX_LIMIT,
+        initial_limit=settings.ADMISSION_INITIAL_LIMIT,
+        max_queue=settings.ADMISSION_MAX_QUEUE,
+        batch_queue_share=settings.ADMISSION_BATCH_QUEUE_SHARE,
+        target_latency=settings.ADMISSION_TARGET_LATENCY_S,
+        client_errors=(UnknownCollection,),
+    )
+
+admission = _build_admission()
+
+def before_fork():
+    """Release per-process state the preloading parent won't use after forking."""
+    embeddings.before_fork()
+
+def after_fork(threads: int):
+    """Re-create per-process state in a worker forked from a preloaded parent."""
+    global admission
+    chain.after_fork()
+    embeddings.after_fork(threads)
+    registry.after_fork()
+    rerank_stats.reset()
+    admission = _build_admission()
 
 class Ask(BaseModel):
     question: str
     k: int | None = None
+    collection: str | None = None
 
-@app.post("/ask")
-def ask(body: Ask):
+@app.exception_handler(Rejected)
+def rejected(request: Request, exc: Rejected):
+    headers = {"Retry-After": str(exc.retry_after)} if exc.retry_after else None
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.reason}, headers=headers)
+
+@app.exception_handler(UnknownCollection)
+def unknown_collection(request: Request, exc: UnknownCollection):
+    return JSONResponse(status_code=404, content={"detail": str(exc)})
+
+def _answer(body: Ask):
+    qa = registry.get(body.collection)
     if body.k:
-        qa.retriever.search_kwargs["k"] = body.k
+        qa = chain.with_k(qa, body.k)
+    start = time.perf_counter()
     result = qa.invoke({"query": body.question})
+    rerank_stats.record_request(time.perf_counter() - start)
     return {
         "answer": result.get("result"),
         "sources": [
@@ -21,3 +76,34 @@ def ask(body: Ask):
             for d in result.get("source_documents", [])
         ],
     }
+
+@app.post("/ask")
+async def ask(
+    body: Ask,
+    request: Request,
+    x_priority: str = Header("interactive"),
+    x_request_timeout: float | None = Header(None),
+):
+    timeout = settings.ADMISSION_QUEUE_TIMEOUT_S
+    if x_request_timeout:
+        timeout = min(timeout, x_request_timeout)
+    async with admission.admit(x_priority, timeout):
+        if await request.is_disconnected():
+            raise Rejected(499, "client disconnected")
+        return await run_in_threadpool(_answer, body)
+
+@app.get("/admission")
+def admission_stats():
+    return admission.stats()
+
+@app.get("/collections")
+def collection_stats():
+    return registry.stats()
+
+@app.get("/rerank")
+def rerank_summary():
+    return rerank_stats.snapshot()
+
+@app.get("/memory")
+def memory_stats():
+    return {"pid": os.getpid(), **memory()}
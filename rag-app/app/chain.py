@@ -1,14 +1,22 @@
 import os
+from functools import lru_cache
 from langchain.chains import RetrievalQA
+from langchain_chroma import Chroma
 from langchain_ibm import WatsonxLLM
 from ibm_watsonx_ai.metanames import GenTextParamsMetaNames as GenParams
 from ibm_watsonx_ai.foundation_models.utils.enums import DecodingMethods
 
 from app.settings import settings
-from app.elastic_backend import build_elastic_retriever
-from app.chroma_backend import build_chroma_retriever
+from app.elastic_backend import build_elastic_retriever, reset_es_client
+from app.chroma_backend import build_chroma_retriever, collection_bytes
+from app.embeddings import get_embeddings
+from app.rerank import RerankingRetriever, get_cross_encoder, with_reranker
+from app.standins import build_fake_llm, build_fake_retriever
 
+@lru_cache(maxsize=None)
 def _build_llm():
+    if settings.LLM_BACKEND.lower() == "fake":
+        return build_fake_llm()
     params = {
         GenParams.DECODING_METHOD: DecodingMethods.GREEDY,
         GenParams.MAX_NEW_TOKENS: settings.LLM_MAX_NEW_TOKENS,
@@ -22,8 +30,72 @@ def _build_llm():
         params=params,
     )
 
-def build_chain():
-    retriever = build_elastic_retriever() if settings.RAG_BACKEND.lower() == "elastic" else build_chroma_retriever()
+def default_collection():
+    if settings.RAG_BACKEND.lower() == "elastic":
+        return os.getenv("ES_INDEX")
+    return settings.CHROMA_COLLECTION
+
+def preload():
+    # Load the process-wide models every chain shares.
+    if settings.RAG_BACKEND.lower() != "fake":
+        get_embeddings()
+    if settings.RERANK_ENABLED:
+        get_cross_encoder()
+    _build_llm()
+
+def build_retriever(collection: str | None = None):
+    backend = settings.RAG_BACKEND.lower()
+    if backend == "elastic":
+        return build_elastic_retriever(collection)
+    if backend == "fake":
+        return build_fake_retriever(collection)
+    return build_chroma_retriever(collection)
+
+def index_bytes(collection: str | None = None) -> int:
+    # What a warm collection holds in this process: Chroma's HNSW index. ES
+    # indexes live on the cluster and the fake retriever holds nothing.
+    if settings.RAG_BACKEND.lower() in ("elastic", "fake"):
+        return 0
+    return collection_bytes(collection)
+
+def retriever_survives_fork():
+    # Chroma retrievers are in-process indexes; ES ones are just a client handle.
+    return settings.RAG_BACKEND.lower() != "elastic"
+
+def after_fork():
+    # HTTP pools opened in the parent must not be shared between workers.
+    _build_llm.cache_clear()
+    reset_es_client()
+
+def build_chain(collection: str | None = None, retriever=None):
+    if retriever is None:
+        retriever = build_retriever(collection)
+        if settings.RERANK_ENABLED:
+            retriever = with_reranker(retriever)
     llm = _build_llm()
     chain = RetrievalQA.from_chain_type(llm=llm, chain_type="stuff", retriever=retriever, return_source_documents=True)
     return chain
+
+def warm_up(chain):
+    # Page the index in now, not on the first user query, without running a
+    # model: api.prefork warms collections in the parent, and neither torch's
+    # OpenMP pool nor an ORT session survives fork(). The reranker is skipped
+    # (which also keeps the synthetic query out of GET /rerank) and Chroma is
+    # searched with a vector it already stores; the ES (sparse, server-side)
+    # and fake retrievers don't embed locally.
+    retriever = chain.retriever
+    if isinstance(retriever, RerankingRetriever):
+        retriever = retriever.base
+    store = getattr(retriever, "vectorstore", None)
+    if isinstance(store, Chroma):
+        stored = store.get(limit=1, include=["embeddings"])["embeddings"]
+        if len(stored):
+            store.similarity_search_by_vector([float(x) for x in stored[0]], k=1)
+        return
+    retriever.invoke("warm-up")
+
+def with_k(chain, k: int):
+    # Shallow per-request copies: the cached chain and its retriever are shared
+    # by concurrent requests, so the override must not touch them.
+    retriever = chain.retriever.model_copy(update={"search_kwargs": {**chain.retriever.search_kwargs, "k": k}})
+    return chain.model_copy(update={"retriever": retriever})
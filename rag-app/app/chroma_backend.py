@@ -1,11 +1,50 @@
 import os
+from functools import lru_cache
+
+import chromadb
+from chromadb.config import Settings
+from chromadb.db.system import SysDB
+from chromadb.types import SegmentScope
 from langchain_chroma import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
 
-def build_chroma_retriever():
+from app.embeddings import get_embeddings
+from app.errors import UnknownCollection
+from app.settings import settings
+
+@lru_cache(maxsize=None)
+def _client(persist_dir: str):
+    # Chroma keeps every HNSW index it has loaded in memory unless its segment
+    # cache is an LRU. Give it the registry's budget: it evicts by the same
+    # on-disk size the registry charges (see collection_bytes).
+    return chromadb.PersistentClient(path=persist_dir, settings=Settings(
+        chroma_segment_cache_policy="LRU",
+        chroma_memory_limit_bytes=settings.REGISTRY_MEMORY_BUDGET_MB * 1024 * 1024,
+    ))
+
+def build_chroma_retriever(collection_name: str | None = None):
     persist_dir = os.getenv("CHROMA_DIR", ".chroma")
-    embeddings = HuggingFaceEmbeddings(
-        model_name=os.getenv("EMBEDDINGS_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
-    )
-    vectordb = Chroma(collection_name="kb", embedding_function=embeddings, persist_directory=persist_dir)
+    default = os.getenv("CHROMA_COLLECTION", "kb")
+    collection_name = collection_name or default
+    client = _client(persist_dir)
+    if collection_name != default:
+        # Only the default collection is created on demand; other names must exist.
+        try:
+            client.get_collection(collection_name)
+        except Exception as e:
+            raise UnknownCollection(f"unknown collection: {collection_name}") from e
+    vectordb = Chroma(client=client, collection_name=collection_name, embedding_function=get_embeddings())
     return vectordb.as_retriever(search_kwargs={"k": 4})
+
+def collection_bytes(collection_name: str | None = None) -> int:
+    """Size on disk of the collection's HNSW index, which is what Chroma loads into memory."""
+    persist_dir = os.getenv("CHROMA_DIR", ".chroma")
+    client = _client(persist_dir)
+    try:
+        collection = client.get_collection(collection_name or os.getenv("CHROMA_COLLECTION", "kb"))
+    except Exception:
+        return 0
+    total = 0
+    for segment in client._system.instance(SysDB).get_segments(collection=collection.id, scope=SegmentScope.VECTOR):
+        for root, _, files in os.walk(os.path.join(persist_dir, str(segment["id"]))):
+            total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+    return total
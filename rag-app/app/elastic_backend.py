@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
 load_dotenv()
 if os.path.exists("es.env"):
@@ -7,11 +8,14 @@ if os.path.exists("es.env"):
 from langchain_ibm import WatsonxLLM
 from ibm_watsonx_ai.metanames import GenTextParamsMetaNames as GenParams
 from ibm_watsonx_ai.foundation_models.utils.enums import DecodingMethods
-from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_elasticsearch import ElasticsearchStore
 from elasticsearch import Elasticsearch
 
-def build_elastic_retriever():
+from app.embeddings import get_embeddings
+from app.errors import UnknownCollection
+
+@lru_cache(maxsize=None)
+def _es_client():
     cloud_id = os.getenv("ES_CLOUD_ID")
     api_key = os.getenv("ES_API_KEY")
     host = os.getenv("ES_HOST")
@@ -22,15 +26,21 @@ def build_elastic_retriever():
         es = Elasticsearch(cloud_id=cloud_id, api_key=api_key)
     else:
         es = Elasticsearch(hosts=[host], basic_auth=(user, pwd))
+    return es
+
+def reset_es_client():
+    _es_client.cache_clear()
 
-    index_name = os.getenv("ES_INDEX")
-    embed_model = os.getenv("EMBEDDINGS_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
-    embeddings = HuggingFaceEmbeddings(model_name=embed_model)
+def build_elastic_retriever(index_name: str | None = None):
+    es = _es_client()
+    index_name = index_name or os.getenv("ES_INDEX")
+    if not es.indices.exists(index=index_name):
+        raise UnknownCollection(f"unknown index: {index_name}")
 
     store = ElasticsearchStore(
         es_url=None,
         index_name=index_name,
-        embedding=embeddings,
+        embedding=get_embeddings(),
         es_client=es,
         strategy=ElasticsearchStore.SparseVectorRetrievalStrategy.BM25,
     )
@@ -0,0 +1,39 @@
+import sys
+from functools import lru_cache
+
+from app.settings import settings
+
+@lru_cache(maxsize=None)
+def get_embeddings():
+    # One model instance per process, shared by every retriever.
+    if settings.EMBEDDINGS_BACKEND.lower() == "onnx":
+        from app.onnx_embeddings import OnnxEmbeddings
+        return OnnxEmbeddings(
+            settings.EMBEDDINGS_MODEL,
+            cache_dir=settings.ONNX_CACHE_DIR,
+            quantize=settings.EMBEDDINGS_QUANTIZE,
+            intra_op_threads=settings.ONNX_INTRA_OP_THREADS,
+            batch_size=settings.EMBEDDINGS_BATCH_SIZE,
+        )
+    from langchain_huggingface import HuggingFaceEmbeddings
+    return HuggingFaceEmbeddings(
+        model_name=settings.EMBEDDINGS_MODEL,
+        encode_kwargs={"batch_size": settings.EMBEDDINGS_BATCH_SIZE},
+    )
+
+def before_fork():
+    # Drop anything that can't be shared copy-on-write (ORT sessions) so the
+    # preloading parent doesn't keep a copy that no worker uses.
+    if get_embeddings.cache_info().currsize:
+        embeddings = get_embeddings()
+        if hasattr(embeddings, "close"):
+            embeddings.close()
+
+def after_fork(threads: int):
+    # Give each worker its share of the CPUs; ORT sessions also need fresh thread pools.
+    if get_embeddings.cache_info().currsize:
+        embeddings = get_embeddings()
+        if hasattr(embeddings, "after_fork"):
+            embeddings.after_fork(threads)
+    if "torch" in sys.modules:  # embeddings and/or the reranker's cross-encoder
+        sys.modules["torch"].set_num_threads(threads)
@@ -0,0 +1,2 @@
+class UnknownCollection(LookupError):
+    pass
@@ -0,0 +1,45 @@
+import os
+
+_PAGE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_MB = 1024 * 1024
+
+
+def rss_bytes(pid="self") -> int:
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * _PAGE
+    except OSError:
+        return 0
+
+
+def memory(pid="self") -> dict:
+    """RSS / PSS / shared / private in MB, from smaps_rollup (Linux 4.14+).
+
+    PSS splits each shared page evenly between the processes mapping it, so
+    summing PSS across workers gives the real footprint, unlike RSS.
+    """
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == "kB":
+                    fields[parts[0].rstrip(":")] = int(parts[1]) * 1024
+    except OSError:
+        return {"rss_mb": round(rss_bytes(pid) / _MB, 1)}
+    shared = fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0)
+    private = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    return {
+        "rss_mb": round(fields.get("Rss", 0) / _MB, 1),
+        "pss_mb": round(fields.get("Pss", 0) / _MB, 1),
+        "shared_mb": round(shared / _MB, 1),
+        "private_mb": round(private / _MB, 1),
+    }
+
+
+def children(pid) -> list[int]:
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(p) for p in f.read().split()]
+    except OSError:
+        return []
@@ -0,0 +1,203 @@
+"""EMBEDDINGS_MODEL on ONNX Runtime, optionally int8.
+
+The Hugging Face model is exported once to ONNX_CACHE_DIR (and, with
+EMBEDDINGS_QUANTIZE, dynamically quantized to int8 weights), then served by
+an ORT session with fixed thread counts. Pooling, normalisation and
+max_seq_length follow the model's sentence-transformers config
+(modules.json, 1_Pooling/config.json, sentence_bert_config.json), so vectors
+line up with ones HuggingFaceEmbeddings already wrote to the index; models
+with modules this backend can't reproduce (e.g. Dense) are refused.
+Inputs are length-sorted and padded per batch so short queries don't pay for
+the longest chunk in the batch.
+
+The ORT session is opened on first use. Its weights live in ORT's own heap,
+so a session is never shared copy-on-write: under api.prefork the parent
+doesn't open one and every worker opens its own (one copy of the weights per
+worker).
+"""
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+
+import numpy as np
+import onnxruntime as ort
+from langchain_core.embeddings import Embeddings
+from transformers import AutoTokenizer
+
+_POOLING_MODES = {
+    "pooling_mode_cls_token": "cls",
+    "pooling_mode_mean_tokens": "mean",
+    "pooling_mode_max_tokens": "max",
+}
+_SUPPORTED_MODULES = ("Transformer", "Pooling", "Normalize")
+
+
+def _st_file(model_name: str, filename: str) -> dict | list | None:
+    if os.path.isdir(model_name):
+        path = os.path.join(model_name, filename)
+        if not os.path.exists(path):
+            return None
+    else:
+        from huggingface_hub import hf_hub_download
+        try:
+            path = hf_hub_download(model_name, filename)
+        except Exception:
+            return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def st_config(model_name: str, tokenizer, model_config) -> dict:
+    """Pooling / normalize / max_seq_length as sentence-transformers would load them."""
+    modules = _st_file(model_name, "modules.json")
+    pooling, normalize = "mean", False  # sentence-transformers' default for plain HF models
+    if modules:
+        kinds = [m["type"].rsplit(".", 1)[-1] for m in modules]
+        unsupported = [k for k in kinds if k not in _SUPPORTED_MODULES]
+        if unsupported:
+            raise ValueError(f"{model_name}: modules {unsupported} are not supported by the ONNX backend")
+        normalize = "Normalize" in kinds
+        pool = next((m for m in modules if m["type"].endswith("Pooling")), None)
+        if pool:
+            cfg = _st_file(model_name, f"{pool['path']}/config.json") or {}
+            modes = [name for key, name in _POOLING_MODES.items() if cfg.get(key)]
+            others = [k for k, v in cfg.items() if k.startswith("pooling_mode_") and v and k not in _POOLING_MODES]
+            if len(modes) != 1 or others:
+                raise ValueError(f"{model_name}: pooling {cfg} is not supported by the ONNX backend")
+            pooling = modes[0]
+    max_seq_length = (_st_file(model_name, "sentence_bert_config.json") or {}).get("max_seq_length")
+    if not max_seq_length:
+        limits = [tokenizer.model_max_length, getattr(model_config, "max_position_embeddings", None)]
+        max_seq_length = min(x for x in limits if x)
+    return {"pooling": pooling, "normalize": normalize, "max_seq_length": max_seq_length}
+
+
+def export(model_name: str, out_dir: Path, quantize: bool) -> Path:
+    # Everything is written to a private temp dir and moved in with os.replace,
+    # model.onnx last: an interrupted export or several processes exporting at
+    # once never leave a truncated file behind that would be reused.
+    fp32 = out_dir / "model.onnx"
+    int8 = out_dir / "model.int8.onnx"
+    tmp = out_dir.parent / f".{out_dir.name}.{os.getpid()}.tmp"
+    try:
+        if not (fp32.exists() and (out_dir / "st_config.json").exists()):
+            import torch
+            from transformers import AutoModel
+
+            tmp.mkdir(parents=True, exist_ok=True)
+            tokenizer = AutoTokenizer.from_pretrained(model_name)
+            model = AutoModel.from_pretrained(model_name).eval()
+            tokenizer.save_pretrained(tmp)
+            with open(tmp / "st_config.json", "w") as f:
+                json.dump(st_config(model_name, tokenizer, model.config), f)
+            sample = tokenizer(["export"], return_tensors="pt")
+            names = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in sample]
+            dynamic = {n: {0: "batch", 1: "seq"} for n in names}
+            dynamic["last_hidden_state"] = {0: "batch", 1: "seq"}
+
+            class Encoder(torch.nn.Module):
+                # Fixed positional signature for the exporter; the HF forward
+                # takes many optional arguments whose order varies by version.
+                def __init__(self):
+                    super().__init__()
+                    self.model = model
+
+                def forward(self, *inputs):
+                    return self.model(**dict(zip(names, inputs))).last_hidden_state
+
+            with torch.no_grad():
+                torch.onnx.export(
+                    Encoder().eval(), tuple(sample[n] for n in names), str(tmp / "model.onnx"),
+                    input_names=names, output_names=["last_hidden_state"],
+                    dynamic_axes=dynamic, opset_version=17, dynamo=False,
+                )
+            out_dir.mkdir(parents=True, exist_ok=True)
+            files = sorted(tmp.iterdir(), key=lambda p: p.name == "model.onnx")
+            for f in files:
+                os.replace(f, out_dir / f.name)
+        if quantize and not int8.exists():
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            tmp.mkdir(parents=True, exist_ok=True)
+            quantize_dynamic(str(fp32), str(tmp / "model.int8.onnx"), weight_type=QuantType.QInt8)
+            os.replace(tmp / "model.int8.onnx", int8)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return int8 if quantize else fp32
+
+
+class OnnxEmbeddings(Embeddings):
+    def __init__(self, model_name: str, cache_dir: str = ".onnx", quantize: bool = False,
+                 intra_op_threads: int = 0, batch_size: int = 32):
+        out_dir = Path(cache_dir) / model_name.replace("/", "__")
+        self.path = export(model_name, out_dir, quantize)
+        with open(out_dir / "st_config.json") as f:
+            cfg = json.load(f)
+        self.pooling = cfg["pooling"]
+        self.normalize = cfg["normalize"]
+        self.max_seq_length = cfg["max_seq_length"]
+        self.intra_op_threads = intra_op_threads
+        self.tokenizer = AutoTokenizer.from_pretrained(out_dir)
+        self.batch_size = batch_size
+        self._session = None
+        self._lock = threading.Lock()
+
+    def _open(self) -> ort.InferenceSession:
+        intra_op_threads = self.intra_op_threads
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        opts.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        # ORT's default counts host cores; honour the cgroup/taskset CPU set instead.
+        if not intra_op_threads and hasattr(os, "sched_getaffinity"):
+            intra_op_threads = len(os.sched_getaffinity(0))
+        opts.intra_op_num_threads = intra_op_threads
+        opts.inter_op_num_threads = 1
+        return ort.InferenceSession(str(self.path), opts, providers=["CPUExecutionProvider"])
+
+    @property
+    def session(self) -> ort.InferenceSession:
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._open()
+                    self.inputs = {i.name for i in self._session.get_inputs()}
+        return self._session
+
+    def close(self):
+        self._session = None
+
+    def after_fork(self, intra_op_threads: int):
+        # ORT's thread pool does not survive fork(); open a fresh session on first use.
+        self.intra_op_threads = intra_op_threads
+        self._lock = threading.Lock()
+        self.close()
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        enc = self.tokenizer(texts, padding=True, truncation=True, max_length=self.max_seq_length, return_tensors="np")
+        session = self.session
+        feed = {k: v.astype(np.int64) for k, v in enc.items() if k in self.inputs}
+        hidden = session.run(None, feed)[0]
+        mask = enc["attention_mask"][..., None].astype(hidden.dtype)
+        if self.pooling == "cls":
+            pooled = hidden[:, 0]
+        elif self.pooling == "max":
+            pooled = np.where(mask > 0, hidden, -1e9).max(axis=1)
+        else:
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        if self.normalize:
+            pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        out = [None] * len(texts)
+        for start in range(0, len(order), self.batch_size):
+            idx = order[start:start + self.batch_size]
+            for i, vec in zip(idx, self._encode([texts[i] for i in idx])):
+                out[i] = vec.tolist()
+        return out
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._encode([text])[0].tolist()
@@ -0,0 +1,136 @@
+"""Per-collection chains kept warm in an LRU.
+
+Every entry shares the process-wide embedding model and LLM client; only the
+vector-store handle (and the index it pulls in) is per collection. Entries are
+charged the size of that index (chain.index_bytes) and evicted
+least-recently-used first once the memory budget or entry cap is exceeded;
+Chroma's own segment cache evicts loaded indexes against the same budget.
+"""
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app.chain import build_chain, index_bytes, preload, retriever_survives_fork, warm_up
+from app.errors import UnknownCollection
+
+log = logging.getLogger(__name__)
+
+# Plain names only: Elasticsearch reads "*", "a,b", "_all", "-x" and "c:x" as
+# patterns over other indices, i.e. other tenants' data.
+_NAME = re.compile(r"[A-Za-z0-9][A-Za-z0-9._-]*")
+
+
+@dataclass
+class _Entry:
+    chain: object
+    bytes: int
+    load_s: float
+    hits: int = 0
+
+
+class RetrieverRegistry:
+    def __init__(self, default: str | None, max_warm: int = 8, memory_budget_mb: int = 1024,
+                 allowed: list[str] | None = None):
+        self.default = default
+        self.allowed = set(allowed or ())
+        self.max_warm = max_warm
+        self.budget = memory_budget_mb * 1024 * 1024
+        self._warm: OrderedDict[str, _Entry] = OrderedDict()
+        self._loading: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "loads": 0, "load_errors": 0, "evictions": 0, "load_s_total": 0.0}
+
+    def _hit(self, name: str):
+        entry = self._warm.get(name)
+        if entry is not None:
+            self._warm.move_to_end(name)
+            entry.hits += 1
+            self._counters["hits"] += 1
+        return entry
+
+    def _check(self, name: str | None):
+        if name == self.default:
+            return
+        if not _NAME.fullmatch(name or "") or (self.allowed and name not in self.allowed):
+            raise UnknownCollection(f"unknown collection: {name}")
+
+    def get(self, name: str | None = None):
+        name = name or self.default
+        self._check(name)
+        with self._lock:
+            entry = self._hit(name)
+            if entry is not None:
+                return entry.chain
+            loading = self._loading.setdefault(name, threading.Lock())
+        # Serialise loads of the same collection; other collections keep serving.
+        with loading:
+            with self._lock:
+                entry = self._hit(name)
+                if entry is not None:
+                    return entry.chain
+                self._counters["misses"] += 1
+            try:
+                entry = self._load(name)
+            except Exception:
+                with self._lock:
+                    self._counters["load_errors"] += 1
+                    self._loading.pop(name, None)
+                raise
+            with self._lock:
+                self._warm[name] = entry
+                self._loading.pop(name, None)
+                self._evict()
+            return entry.chain
+
+    def _load(self, name: str) -> _Entry:
+        preload()  # keep model loading out of the first entry's load time
+        start = time.perf_counter()
+        chain = build_chain(name)
+        warm_up(chain)
+        load_s = time.perf_counter() - start
+        with self._lock:
+            self._counters["loads"] += 1
+            self._counters["load_s_total"] += load_s
+        return _Entry(chain, index_bytes(name), load_s)
+
+    def _evict(self):
+        used = sum(e.bytes for e in self._warm.values())
+        while len(self._warm) > 1 and (len(self._warm) > self.max_warm or used > self.budget):
+            _, entry = self._warm.popitem(last=False)
+            used -= entry.bytes
+            self._counters["evictions"] += 1
+
+    def after_fork(self):
+        # Locks may have been held by another thread at fork time; network
+        # clients must not be shared. Warm retrievers (and the index pages
+        # behind them) stay shared; chains are rebuilt around them.
+        self._lock = threading.Lock()
+        self._loading = {}
+        self._counters = dict.fromkeys(self._counters, 0)
+        for name, entry in self._warm.items():
+            retriever = entry.chain.retriever if retriever_survives_fork() else None
+            entry.chain = build_chain(name, retriever=retriever)
+            entry.hits = 0
+
+    def warm(self, names):
+        for name in names:
+            try:
+                self.get(name)
+            except UnknownCollection as e:
+                log.warning("skipping warm-up: %s", e)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "default": self.default,
+                "memory_budget_mb": self.budget // (1024 * 1024),
+                "memory_used_mb": round(sum(e.bytes for e in self._warm.values()) / (1024 * 1024), 1),
+                "warm": {
+                    name: {"mb": round(e.bytes / (1024 * 1024), 1), "load_s": round(e.load_s, 3), "hits": e.hits}
+                    for name, e in reversed(self._warm.items())
+                },
+                **self._counters,
+            }
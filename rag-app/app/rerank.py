@@ -0,0 +1,125 @@
+"""Cross-encoder rerank stage between retrieval and the LLM.
+
+The base retriever fetches RERANK_CANDIDATES passages; a small CPU
+cross-encoder scores them in batches, and only the head of the ranking is
+kept: at most k (RERANK_MAX_KEEP, or the per-request k), at least
+RERANK_MIN_KEEP, nothing under RERANK_MIN_SCORE, and nothing past the first
+score drop of RERANK_MIN_GAP or more. Scores are the model's raw logits.
+"""
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from app.settings import settings
+
+
+@lru_cache(maxsize=None)
+def get_cross_encoder():
+    from sentence_transformers import CrossEncoder
+    return CrossEncoder(settings.RERANK_MODEL, device="cpu", max_length=settings.RERANK_MAX_LENGTH)
+
+
+def cutoff(scores: list[float], max_keep: int, min_keep: int, min_score: float, min_gap: float) -> int:
+    """How many of the descending `scores` to keep."""
+    n = min(len(scores), max_keep)
+    keep = min(max(min_keep, 1), n)
+    while keep < n and scores[keep] >= min_score and scores[keep - 1] - scores[keep] < min_gap:
+        keep += 1
+    return keep
+
+
+def _tokens(docs: list[Document]) -> int:
+    # ~4 characters per token; the LLM's own tokenizer isn't available here.
+    return sum(len(d.page_content) for d in docs) // 4
+
+
+def _pct(values, p):
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(p / 100 * len(values)))], 2) if values else None
+
+
+class RerankStats:
+    def __init__(self, window: int = 1000):
+        self.reset(window)
+
+    def reset(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self.rerank_ms = deque(maxlen=window)
+        self.e2e_ms = deque(maxlen=window)
+        self.totals = dict.fromkeys(("reranks", "candidates", "kept", "tokens_baseline", "tokens_kept"), 0)
+
+    def record_rerank(self, ms: float, candidates: int, kept: int, tokens_baseline: int, tokens_kept: int):
+        with self._lock:
+            self.rerank_ms.append(ms)
+            for key, value in zip(self.totals, (1, candidates, kept, tokens_baseline, tokens_kept)):
+                self.totals[key] += value
+
+    def record_request(self, seconds: float):
+        with self._lock:
+            self.e2e_ms.append(seconds * 1000)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            t = self.totals
+            return {
+                "enabled": settings.RERANK_ENABLED,
+                **t,
+                "dropped": t["candidates"] - t["kept"],
+                "prompt_tokens_saved_pct": round(100 * (1 - t["tokens_kept"] / t["tokens_baseline"]), 1)
+                if t["tokens_baseline"] else None,
+                "rerank_ms": {"p50": _pct(self.rerank_ms, 50), "p95": _pct(self.rerank_ms, 95)},
+                "e2e_ms": {"p50": _pct(self.e2e_ms, 50), "p95": _pct(self.e2e_ms, 95)},
+            }
+
+
+stats = RerankStats()
+
+
+class RerankingRetriever(BaseRetriever):
+    base: BaseRetriever
+    # search_kwargs["k"] is the most passages handed to the LLM, so the
+    # per-request k override (chain.with_k) applies here too.
+    search_kwargs: dict = {"k": 4}
+    min_keep: int = 1
+    min_score: float = -5.0
+    min_gap: float = 2.0
+    batch_size: int = 32
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> list[Document]:
+        candidates = self.base.invoke(query, config={"callbacks": run_manager.get_child()})
+        max_keep = self.search_kwargs.get("k", 4)
+        if len(candidates) <= min(self.min_keep, max_keep):
+            return candidates
+        start = time.perf_counter()
+        scores = get_cross_encoder().predict(
+            [(query, d.page_content) for d in candidates],
+            batch_size=self.batch_size, show_progress_bar=False,
+        )
+        ranked = sorted(zip(scores.tolist(), candidates), key=lambda x: x[0], reverse=True)
+        keep = cutoff([s for s, _ in ranked], max_keep, self.min_keep, self.min_score, self.min_gap)
+        kept = []
+        for score, doc in ranked[:keep]:
+            doc.metadata = {**(doc.metadata or {}), "rerank_score": round(score, 4)}
+            kept.append(doc)
+        stats.record_rerank(
+            (time.perf_counter() - start) * 1000, len(candidates), len(kept),
+            _tokens(candidates[:max_keep]), _tokens(kept),
+        )
+        return kept
+
+
+def with_reranker(retriever: BaseRetriever) -> RerankingRetriever:
+    retriever.search_kwargs["k"] = settings.RERANK_CANDIDATES
+    return RerankingRetriever(
+        base=retriever,
+        search_kwargs={"k": settings.RERANK_MAX_KEEP},
+        min_keep=settings.RERANK_MIN_KEEP,
+        min_score=settings.RERANK_MIN_SCORE,
+        min_gap=settings.RERANK_MIN_GAP,
+        batch_size=settings.RERANK_BATCH_SIZE,
+    )
@@ -7,9 +7,40 @@ class Settings(BaseSettings):
     LLM_MODEL_ID: str = "ibm/granite-3-3-8b-instruct"
     LLM_TEMPERATURE: float = 0.2
     LLM_MAX_NEW_TOKENS: int = 128
+    LLM_BACKEND: str = "watsonx"
     RAG_BACKEND: str = "elastic"
     CHROMA_DIR: str = ".chroma"
+    CHROMA_COLLECTION: str = "kb"
     EMBEDDINGS_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
+    EMBEDDINGS_BACKEND: str = "torch"
+    EMBEDDINGS_QUANTIZE: bool = False
+    EMBEDDINGS_BATCH_SIZE: int = 32
+    ONNX_CACHE_DIR: str = ".onnx"
+    ONNX_INTRA_OP_THREADS: int = 0
+    RERANK_ENABLED: bool = False
+    RERANK_MODEL: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    RERANK_CANDIDATES: int = 20
+    RERANK_MAX_KEEP: int = 4
+    RERANK_MIN_KEEP: int = 1
+    RERANK_MIN_SCORE: float = -5.0
+    RERANK_MIN_GAP: float = 2.0
+    RERANK_BATCH_SIZE: int = 32
+    RERANK_MAX_LENGTH: int = 512
+    REGISTRY_MAX_WARM: int = 8
+    REGISTRY_MEMORY_BUDGET_MB: int = 1024
+    REGISTRY_WARM: str = ""
+    REGISTRY_COLLECTIONS: str = ""
+    STANDIN_LLM_TTFT_MS: float = 300.0
+    STANDIN_LLM_TOKENS_PER_S: float = 30.0
+    STANDIN_RETRIEVER_MS: float = 20.0
+    STANDIN_LATENCY_SIGMA: float = 0.5
+    ADMISSION_MIN_LIMIT: int = 1
+    ADMISSION_MAX_LIMIT: int = 16
+    ADMISSION_INITIAL_LIMIT: int = 4
+    ADMISSION_MAX_QUEUE: int = 32
+    ADMISSION_BATCH_QUEUE_SHARE: float = 0.5
+    ADMISSION_TARGET_LATENCY_S: float = 8.0
+    ADMISSION_QUEUE_TIMEOUT_S: float = 30.0
 
     class Config:
         env_file = ".env"
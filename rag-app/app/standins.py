@@ -0,0 +1,70 @@
+"""Offline stand-ins for watsonx and the vector store.
+
+Selected with LLM_BACKEND=fake / RAG_BACKEND=fake so the API can be load
+tested on one box with no network. Latencies are drawn from a lognormal
+around the configured median, which is close enough to real LLM / ANN tails
+to expose queueing behaviour.
+"""
+import random
+import time
+from typing import Any
+
+from langchain_core.callbacks import CallbackManagerForLLMRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.language_models.llms import LLM
+from langchain_core.retrievers import BaseRetriever
+
+from app.settings import settings
+
+
+def _lognormal(median_s: float, sigma: float) -> float:
+    return random.lognormvariate(0, sigma) * median_s if median_s > 0 else 0.0
+
+
+class FakeWatsonxLLM(LLM):
+    ttft_s: float = 0.3
+    tokens_per_s: float = 30.0
+    max_new_tokens: int = 128
+    sigma: float = 0.5
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-watsonx"
+
+    def _call(self, prompt: str, stop: list[str] | None = None,
+              run_manager: CallbackManagerForLLMRun | None = None, **kwargs: Any) -> str:
+        tokens = random.randint(self.max_new_tokens // 2, self.max_new_tokens)
+        time.sleep(_lognormal(self.ttft_s, self.sigma) + tokens / self.tokens_per_s)
+        return " ".join(["token"] * tokens)
+
+
+class FakeRetriever(BaseRetriever):
+    collection: str = "kb"
+    latency_s: float = 0.02
+    sigma: float = 0.5
+    search_kwargs: dict = {"k": 4}
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> list[Document]:
+        time.sleep(_lognormal(self.latency_s, self.sigma))
+        return [
+            Document(page_content=f"Synthetic passage {i} about: {query} " * 8,
+                     metadata={"source": f"{self.collection}/doc-{i}"})
+            for i in range(self.search_kwargs.get("k", 4))
+        ]
+
+
+def build_fake_llm():
+    return FakeWatsonxLLM(
+        ttft_s=settings.STANDIN_LLM_TTFT_MS / 1000,
+        tokens_per_s=settings.STANDIN_LLM_TOKENS_PER_S,
+        max_new_tokens=settings.LLM_MAX_NEW_TOKENS,
+        sigma=settings.STANDIN_LATENCY_SIGMA,
+    )
+
+
+def build_fake_retriever(collection: str | None = None):
+    return FakeRetriever(
+        collection=collection or settings.CHROMA_COLLECTION,
+        latency_s=settings.STANDIN_RETRIEVER_MS / 1000,
+        sigma=settings.STANDIN_LATENCY_SIGMA,
+    )
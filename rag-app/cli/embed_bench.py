@@ -0,0 +1,103 @@
+"""Check the ONNX embedding backend against PyTorch and time both.
+
+    python -m cli.embed_bench [--quantize] [--file chunks.txt] [--n 512]
+
+Equivalence is checked on the raw vectors each backend would write to the
+index: per-text cosine, relative difference in vector norm (catches a
+pooling/normalisation mismatch that cosine alone hides) and top-k neighbour
+overlap by inner product. Exits non-zero if the worst cosine is below
+--min-cosine or the worst norm error above --max-norm-error, so it can gate
+a switch to EMBEDDINGS_BACKEND=onnx.
+"""
+import argparse, json, random, statistics, sys, time
+import numpy as np
+from langchain_huggingface import HuggingFaceEmbeddings
+
+from app.onnx_embeddings import OnnxEmbeddings
+from app.settings import settings
+
+WORDS = ("watsonx granite retrieval augmented generation vector index chunk embedding prompt "
+         "token latency throughput governance model answer context document query cluster").split()
+# (min cosine, max norm error) by --quantize; tests/test_onnx_embeddings.py uses the same.
+THRESHOLDS = {False: (0.99, 0.01), True: (0.95, 0.05)}
+
+
+def corpus(args):
+    if args.file:
+        with open(args.file) as f:
+            return [line.strip() for line in f if line.strip()][: args.n]
+    rng = random.Random(0)
+    return [" ".join(rng.choices(WORDS, k=rng.randint(5, 120))) for _ in range(args.n)]
+
+
+def drift(a, b):
+    """Per-text cosine and relative norm error of raw vectors `b` against `a`."""
+    a, b = np.asarray(a), np.asarray(b)
+    norm_a, norm_b = np.linalg.norm(a, axis=1), np.linalg.norm(b, axis=1)
+    return (a * b).sum(axis=1) / (norm_a * norm_b), np.abs(norm_b - norm_a) / norm_a
+
+
+def timed(backend, texts):
+    backend.embed_documents(texts[:8])  # warm-up
+    start = time.perf_counter()
+    docs = np.asarray(backend.embed_documents(texts))
+    docs_s = time.perf_counter() - start
+    lat = []
+    for t in texts[:50]:
+        start = time.perf_counter()
+        backend.embed_query(t)
+        lat.append(time.perf_counter() - start)
+    return docs, {"docs_per_s": round(len(texts) / docs_s, 1), "query_p50_ms": round(statistics.median(lat) * 1000, 2)}
+
+
+def main():
+    p = argparse.ArgumentParser(description="Compare ONNX and PyTorch embeddings for EMBEDDINGS_MODEL")
+    p.add_argument("--file", type=str, default=None, help="One text per line (default: synthetic)")
+    p.add_argument("--n", type=int, default=512, help="Number of texts")
+    p.add_argument("--quantize", action="store_true", help="Use the int8 ONNX model")
+    p.add_argument("--k", type=int, default=10, help="Neighbours for the overlap check")
+    p.add_argument("--min-cosine", type=float, default=None, help="Fail below this (default 0.99, int8 0.95)")
+    p.add_argument("--max-norm-error", type=float, default=None, help="Fail above this (default 0.01, int8 0.05)")
+    args = p.parse_args()
+    min_cos, max_norm_err = THRESHOLDS[args.quantize]
+    min_cos = args.min_cosine or min_cos
+    max_norm_err = args.max_norm_error or max_norm_err
+
+    texts = corpus(args)
+    torch_be = HuggingFaceEmbeddings(model_name=settings.EMBEDDINGS_MODEL,
+                                     encode_kwargs={"batch_size": settings.EMBEDDINGS_BATCH_SIZE})
+    onnx_be = OnnxEmbeddings(settings.EMBEDDINGS_MODEL, cache_dir=settings.ONNX_CACHE_DIR, quantize=args.quantize,
+                             intra_op_threads=settings.ONNX_INTRA_OP_THREADS, batch_size=settings.EMBEDDINGS_BATCH_SIZE)
+    a, torch_perf = timed(torch_be, texts)
+    b, onnx_perf = timed(onnx_be, texts)
+    cos, norm_err = drift(a, b)
+    k = min(args.k, len(texts) - 1)
+    top_a = np.argsort(-(a @ a.T), axis=1)[:, 1 : k + 1]
+    top_b = np.argsort(-(b @ b.T), axis=1)[:, 1 : k + 1]
+    overlap = np.mean([len(set(x) & set(y)) / k for x, y in zip(top_a, top_b)])
+
+    report = {
+        "model": settings.EMBEDDINGS_MODEL,
+        "precision": "int8" if args.quantize else "fp32",
+        "texts": len(texts),
+        "cosine_min": round(float(cos.min()), 5),
+        "cosine_mean": round(float(cos.mean()), 5),
+        "norm_error_max": round(float(norm_err.max()), 5),
+        f"top{k}_overlap": round(float(overlap), 4),
+        "torch": torch_perf,
+        "onnx": onnx_perf,
+        "speedup": round(onnx_perf["docs_per_s"] / torch_perf["docs_per_s"], 2),
+    }
+    print(json.dumps(report, indent=2))
+    failed = False
+    if cos.min() < min_cos:
+        print(f"FAIL: min cosine {cos.min():.4f} < {min_cos}", file=sys.stderr)
+        failed = True
+    if norm_err.max() > max_norm_err:
+        print(f"FAIL: max norm error {norm_err.max():.4f} > {max_norm_err}", file=sys.stderr)
+        failed = True
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
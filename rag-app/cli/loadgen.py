@@ -0,0 +1,170 @@
+"""Load generator for the /ask endpoints (rag-app and accelerator).
+
+    python -m cli.loadgen open   --rate 5 --duration 60
+    python -m cli.loadgen closed --users 16 --duration 60
+    python -m cli.loadgen open   --sweep 1,2,4,8,16 --standins
+
+--standins starts rag-app locally with the fake LLM and retriever so a
+single box with no network can find its own saturation point. Each run
+prints per-second throughput / latency percentiles / errors; a sweep also
+reports the knee, taken as the step with the highest power
+(throughput / p50 latency) that is not yet shedding load, i.e. the last
+point before queueing dominates.
+"""
+import argparse, asyncio, json, os, random, subprocess, sys, time
+import httpx
+
+QUESTION = "What is retrieval-augmented generation?"
+
+
+def pct(values, p):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+class Recorder:
+    def __init__(self):
+        self.start = time.monotonic()
+        self.samples = []  # (t_done, latency_s, status)
+
+    def add(self, sent, status):
+        now = time.monotonic()
+        self.samples.append((now - self.start, now - sent, status))
+
+    def summary(self, samples=None, window=None):
+        samples = self.samples if samples is None else samples
+        ok = [lat for _, lat, st in samples if st == 200]
+        window = window or (max((t for t, _, _ in samples), default=0) or 1)
+        return {
+            "requests": len(samples),
+            "throughput_rps": round(len(ok) / window, 2),
+            "error_rate": round(1 - len(ok) / len(samples), 3) if samples else 0.0,
+            **{f"p{p}_s": round(v, 4) if (v := pct(ok, p)) is not None else None for p in (50, 95, 99)},
+            "status": {str(s): sum(1 for _, _, st in samples if st == s) for s in sorted({st for _, _, st in samples}, key=str)},
+        }
+
+    def timeline(self, bucket=1.0):
+        buckets = {}
+        for s in self.samples:
+            buckets.setdefault(int(s[0] // bucket), []).append(s)
+        return [{"t": i * bucket, **self.summary(b, bucket)} for i, b in sorted(buckets.items())]
+
+
+async def one(client, args, rec):
+    sent = time.monotonic()
+    headers = {"X-Priority": args.priority, "X-Request-Timeout": str(args.timeout)}
+    try:
+        r = await client.post("/ask", json={"question": QUESTION}, headers=headers, timeout=args.timeout)
+        rec.add(sent, r.status_code)
+    except httpx.HTTPError as e:
+        rec.add(sent, type(e).__name__)
+
+
+async def run_open(client, args, rate):
+    rec, tasks = Recorder(), []
+    end = rec.start + args.duration
+    nxt = rec.start
+    while nxt < end:
+        await asyncio.sleep(max(0, nxt - time.monotonic()))
+        tasks.append(asyncio.create_task(one(client, args, rec)))
+        nxt += random.expovariate(rate) if args.poisson else 1 / rate
+    await asyncio.gather(*tasks)
+    return rec
+
+
+async def run_closed(client, args, users):
+    rec = Recorder()
+    end = rec.start + args.duration
+
+    async def user():
+        while time.monotonic() < end:
+            await one(client, args, rec)
+            if args.think:
+                await asyncio.sleep(random.expovariate(1 / args.think))
+
+    await asyncio.gather(*(user() for _ in range(users)))
+    return rec
+
+
+def knee(steps, max_error):
+    # Kleinrock's power: throughput per unit of latency peaks right at the knee.
+    # Steps that shed load are past saturation even if admitted latency looks fine.
+    scored = [(s["throughput_rps"] / s["p50_s"], s) for s in steps if s["p50_s"] and s["error_rate"] <= max_error]
+    return max(scored, key=lambda x: x[0])[1] if scored else None
+
+
+def start_standins(args):
+    env = {**os.environ, "LLM_BACKEND": "fake", "RAG_BACKEND": "fake",
+           "STANDIN_LLM_TTFT_MS": str(args.ttft_ms), "STANDIN_LLM_TOKENS_PER_S": str(args.tokens_per_s),
+           "STANDIN_RETRIEVER_MS": str(args.retriever_ms), "STANDIN_LATENCY_SIGMA": str(args.sigma)}
+    port = args.url.rsplit(":", 1)[-1].rstrip("/")
+    proc = subprocess.Popen([sys.executable, "-m", "uvicorn", "api.server:app", "--port", port, "--log-level", "warning"], env=env)
+    for _ in range(100):
+        try:
+            httpx.get(f"{args.url}/admission", timeout=1)
+            return proc
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise SystemExit("stand-in server did not come up")
+
+
+async def main_async(args):
+    levels = [float(x) for x in args.sweep.split(",")] if args.sweep else [args.rate if args.mode == "open" else args.users]
+    steps = []
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits) as client:
+        for level in levels:
+            rec = await (run_open(client, args, level) if args.mode == "open" else run_closed(client, args, int(level)))
+            step = {"level": level, **rec.summary(window=args.duration)}
+            steps.append(step)
+            print(f"\n=== {args.mode} level={level:g} ===")
+            for row in rec.timeline():
+                print(f"t={row['t']:>5.0f}s  rps={row['throughput_rps']:>6}  p50={row['p50_s'] or 0:.3f}  "
+                      f"p95={row['p95_s'] or 0:.3f}  p99={row['p99_s'] or 0:.3f}  err={row['error_rate']:.1%}")
+            print(json.dumps(step))
+            if args.json:
+                step["timeline"] = rec.timeline()
+    result = {"mode": args.mode, "steps": steps}
+    if len(steps) > 1:
+        k = knee(steps, args.max_error)
+        result["knee"] = k and {key: k[key] for key in ("level", "throughput_rps", "p50_s", "p99_s")}
+        print(f"\nknee: {json.dumps(result['knee'])}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+def main():
+    p = argparse.ArgumentParser(description="Load test the /ask endpoint")
+    p.add_argument("mode", choices=["open", "closed"], help="open: fixed arrival rate; closed: N virtual users")
+    p.add_argument("--url", default="http://127.0.0.1:8001", help="Service base URL")
+    p.add_argument("--rate", type=float, default=2.0, help="Arrivals per second (open)")
+    p.add_argument("--poisson", action="store_true", help="Poisson instead of evenly spaced arrivals (open)")
+    p.add_argument("--users", type=int, default=4, help="Virtual users (closed)")
+    p.add_argument("--think", type=float, default=0.0, help="Mean think time between requests, seconds (closed)")
+    p.add_argument("--sweep", type=str, default=None, help="Comma-separated rates/user counts; reports the knee")
+    p.add_argument("--duration", type=float, default=30.0, help="Seconds per level")
+    p.add_argument("--timeout", type=float, default=30.0, help="Client timeout, also sent as X-Request-Timeout")
+    p.add_argument("--priority", default="interactive", choices=["interactive", "batch"])
+    p.add_argument("--max-error", type=float, default=0.01, help="Error rate above which a sweep step counts as saturated")
+    p.add_argument("--json", type=str, default=None, help="Write full results to this file")
+    p.add_argument("--standins", action="store_true", help="Start rag-app locally with fake LLM and retriever")
+    p.add_argument("--ttft-ms", type=float, default=300.0, help="Stand-in LLM median time to first token")
+    p.add_argument("--tokens-per-s", type=float, default=30.0, help="Stand-in LLM generation rate")
+    p.add_argument("--retriever-ms", type=float, default=20.0, help="Stand-in retriever median latency")
+    p.add_argument("--sigma", type=float, default=0.5, help="Lognormal sigma for stand-in latencies")
+    args = p.parse_args()
+
+    proc = start_standins(args) if args.standins else None
+    try:
+        asyncio.run(main_async(args))
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Memory footprint and startup time for 1..N workers: prefork vs. uvicorn.
+
+    python -m cli.prefork_bench --workers 1,2,4,8
+
+For each worker count, starts `python -m api.prefork` and then plain
+`uvicorn --workers` (every worker runs build_chain itself), waits until
+every worker has answered GET /memory, and records time-to-ready plus
+RSS and PSS summed over the whole process tree. PSS is the honest number:
+pages shared copy-on-write are split between the processes mapping them.
+private/worker is what each extra worker costs on top of the shared pages;
+run once more with EMBEDDINGS_BACKEND=onnx to see the ORT weights there, since
+every worker holds its own session:
+
+    EMBEDDINGS_BACKEND=onnx python -m cli.prefork_bench --workers 1,2,4,8
+"""
+import argparse, json, signal, subprocess, sys, time
+import httpx
+
+from app.memory import children, memory
+from app.settings import settings
+
+COMMANDS = {
+    "prefork": lambda n, port: [sys.executable, "-m", "api.prefork", "--workers", str(n), "--port", str(port)],
+    "uvicorn": lambda n, port: [sys.executable, "-m", "uvicorn", "api.server:app", "--workers", str(n),
+                                "--port", str(port), "--log-level", "warning"],
+}
+
+
+def tree(pid):
+    pids, todo = [], [pid]
+    while todo:
+        p = todo.pop()
+        pids.append(p)
+        todo.extend(children(p))
+    return pids
+
+
+def measure(mode, n, port, timeout):
+    started = time.monotonic()
+    proc = subprocess.Popen(COMMANDS[mode](n, port), stdout=subprocess.DEVNULL)
+    seen = set()
+    try:
+        while len(seen) < n:
+            if time.monotonic() - started > timeout:
+                raise RuntimeError(f"{mode} x{n}: only {len(seen)} workers ready after {timeout}s")
+            if proc.poll() is not None:
+                raise RuntimeError(f"{mode} x{n}: exited with {proc.returncode}")
+            try:
+                # Fresh connection each time so the kernel spreads us across workers.
+                seen.add(httpx.get(f"http://127.0.0.1:{port}/memory", timeout=2).json()["pid"])
+            except httpx.HTTPError:
+                time.sleep(0.2)
+        ready_s = time.monotonic() - started
+        time.sleep(1)  # let the last worker finish its startup allocations
+        mem = [memory(p) for p in tree(proc.pid)]
+        workers = [memory(p) for p in seen]
+        return {
+            "mode": mode, "embeddings": settings.EMBEDDINGS_BACKEND, "workers": n, "ready_s": round(ready_s, 2),
+            "rss_total_mb": round(sum(m.get("rss_mb", 0) for m in mem), 1),
+            "pss_total_mb": round(sum(m.get("pss_mb", 0) for m in mem), 1),
+            "pss_per_worker_mb": round(sum(w.get("pss_mb", 0) for w in workers) / n, 1),
+            "private_per_worker_mb": round(sum(w.get("private_mb", 0) for w in workers) / n, 1),
+        }
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def main():
+    p = argparse.ArgumentParser(description="Compare prefork and uvicorn --workers memory/startup")
+    p.add_argument("--workers", type=str, default="1,2,4", help="Comma-separated worker counts")
+    p.add_argument("--modes", type=str, default="prefork,uvicorn")
+    p.add_argument("--port", type=int, default=8101)
+    p.add_argument("--timeout", type=float, default=300.0, help="Seconds to wait for all workers")
+    p.add_argument("--json", type=str, default=None, help="Write results to this file")
+    args = p.parse_args()
+
+    rows = []
+    print(f"embeddings: {settings.EMBEDDINGS_BACKEND}")
+    print(f"{'mode':8} {'workers':>7} {'ready_s':>8} {'rss_mb':>9} {'pss_mb':>9} {'pss/worker':>10} {'private/worker':>14}")
+    for n in (int(x) for x in args.workers.split(",")):
+        for mode in args.modes.split(","):
+            r = measure(mode, n, args.port, args.timeout)
+            rows.append(r)
+            print(f"{mode:8} {n:>7} {r['ready_s']:>8} {r['rss_total_mb']:>9} {r['pss_total_mb']:>9} {r['pss_per_worker_mb']:>10} {r['private_per_worker_mb']:>14}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+if __name__ == "__main__":
+    main()
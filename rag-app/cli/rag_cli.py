@@ -4,10 +4,11 @@ from app.chain import build_chain
 def main():
     p = argparse.ArgumentParser(description="Ask your grounded RAG agent a question")
     p.add_argument("question", type=str, help="Your question")
+    p.add_argument("--collection", type=str, default=None, help="Chroma collection / ES index to query")
     p.add_argument("--show-sources", action="store_true", help="Print retrieved source chunks")
     args = p.parse_args()
 
-    qa = build_chain()
+    qa = build_chain(args.collection)
     result = qa.invoke({"query": args.question})
 
     print("\n=== ANSWER ===\n")
@@ -0,0 +1 @@
+# Lets pytest import `app` / `api` from rag-app when run from the repo root.
@@ -0,0 +1,14 @@
+from langchain.chains import RetrievalQA
+
+from app.chain import with_k
+from app.standins import FakeRetriever, build_fake_llm
+
+
+def test_with_k_leaves_shared_chain_alone():
+    shared = RetrievalQA.from_chain_type(
+        llm=build_fake_llm(), chain_type="stuff", retriever=FakeRetriever(latency_s=0), return_source_documents=True,
+    )
+    copy = with_k(shared, 2)
+    assert shared.retriever.search_kwargs["k"] == 4
+    assert len(copy.retriever.invoke("q")) == 2
+    assert len(shared.retriever.invoke("q")) == 4
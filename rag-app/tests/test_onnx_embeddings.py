@@ -0,0 +1,37 @@
+import pytest
+
+from app.settings import settings
+from cli.embed_bench import THRESHOLDS, drift
+
+TEXTS = [
+    "What is watsonx.ai?",
+    "granite",
+    "Retrieval augmented generation grounds the answer in passages fetched from a vector index.",
+    "Chunk documents before embedding them; long chunks are truncated at max_seq_length.",
+    "latency throughput governance " * 40,
+    "Elasticsearch and Chroma both store the embedding next to the chunk text.",
+]
+
+
+@pytest.fixture(scope="module")
+def reference():
+    try:
+        from langchain_huggingface import HuggingFaceEmbeddings
+        return HuggingFaceEmbeddings(model_name=settings.EMBEDDINGS_MODEL).embed_documents(TEXTS)
+    except Exception as e:  # no network / model not cached
+        pytest.skip(f"can't load {settings.EMBEDDINGS_MODEL}: {e}")
+
+
+@pytest.mark.parametrize("quantize", [False, True], ids=["fp32", "int8"])
+def test_matches_sentence_transformers(reference, quantize, tmp_path_factory):
+    from app.onnx_embeddings import OnnxEmbeddings
+
+    onnx = OnnxEmbeddings(settings.EMBEDDINGS_MODEL, cache_dir=str(tmp_path_factory.getbasetemp() / "onnx"),
+                          quantize=quantize)
+    min_cos, max_norm_err = THRESHOLDS[quantize]
+    cos, norm_err = drift(reference, onnx.embed_documents(TEXTS))
+    assert cos.min() >= min_cos
+    assert norm_err.max() <= max_norm_err
+    cos, norm_err = drift(reference[:1], [onnx.embed_query(TEXTS[0])])
+    assert cos.min() >= min_cos
+    assert norm_err.max() <= max_norm_err
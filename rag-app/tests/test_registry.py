@@ -0,0 +1,18 @@
+import pytest
+
+from app.errors import UnknownCollection
+from app.registry import RetrieverRegistry
+
+
+@pytest.mark.parametrize("name", ["*", "_all", "tenant-a,tenant-b", ".security", "-kb", "remote:kb", "kb*"])
+def test_rejects_patterns(name):
+    registry = RetrieverRegistry(default="kb")
+    with pytest.raises(UnknownCollection):
+        registry.get(name)
+    assert registry.stats()["misses"] == 0
+
+
+def test_allowlist():
+    registry = RetrieverRegistry(default="kb", allowed=["tenant-a"])
+    with pytest.raises(UnknownCollection):
+        registry.get("tenant-b")
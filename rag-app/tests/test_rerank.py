@@ -0,0 +1,26 @@
+from app.rerank import cutoff
+
+
+def test_cuts_at_first_large_drop():
+    assert cutoff([9, 6.5, 3.5, 0, -1], 10, 1, -5, 2.0) == 1
+
+
+def test_keeps_until_drop():
+    assert cutoff([9, 8.5, 8, 5, 4], 10, 1, -5, 2.0) == 3
+
+
+def test_never_more_than_max_keep():
+    assert cutoff([5, 4], 1, 3, -5, 2.0) == 1
+    assert cutoff([5, 4.5, 4, 3.5], 2, 1, -5, 2.0) == 2
+
+
+def test_min_keep_ignores_gap_and_score():
+    assert cutoff([9, 1, -8], 10, 2, -5, 2.0) == 2
+
+
+def test_min_score():
+    assert cutoff([0, -1, -2.5, -4, -5.5], 10, 1, -5, 2.0) == 4
+
+
+def test_empty():
+    assert cutoff([], 4, 1, -5, 2.0) == 0